@@ -15,6 +15,7 @@ from threading import Thread
 from typing import cast
 
 from flask import Flask
+from werkzeug.serving import make_server
 
 
 class ServerThread(Thread):
@@ -23,8 +24,6 @@ class ServerThread(Thread):
         self.app = app
 
     def run(self):
-        from werkzeug.serving import make_server
-
         self.server = make_server("localhost", 5000, self.app, threaded=True)
         self.server.serve_forever(poll_interval=0.1)
 
@@ -1,9 +1,6 @@
-from asyncio import to_thread
-from queue import Empty
-
 from fastapi import APIRouter, Response
 from fastapi.responses import StreamingResponse
-from hmr_reloader import send_reload_signal, subscription
+from hmr_reloader import async_subscription, send_reload_signal
 
 reload_router = APIRouter(prefix="/---fastapi-reloader---", tags=["hmr"])
 __all__ = ["reload_router", "send_reload_signal"]
@@ -17,14 +14,10 @@ async def heartbeat():
 @reload_router.get("")
 async def subscribe():
     async def event_generator():
-        with subscription() as q:
+        with async_subscription() as q:
             yield "0\n"
             while True:
-                try:
-                    value = await to_thread(q.get, timeout=1)
-                except Empty:
-                    yield "0\n"
-                    continue
+                value = await q.get()  # the hub sends a `0` heartbeat every second
                 yield f"{value}\n"
                 if value == 1:
                     break
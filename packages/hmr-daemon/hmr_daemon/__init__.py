@@ -1,10 +1,11 @@
 import os
+import sys
 
 if "NO_HMR_DAEMON" not in os.environ:
-    from threading import enumerate
-
-    if all(t.name != "hmr-daemon" for t in enumerate()):
-        if os.name == "nt":
+    # the platform submodule starts the daemon thread as an import side effect, so it being loaded means we're already running
+    # (an O(1) lookup that, unlike an environment variable, is not inherited by child processes)
+    if os.name == "nt":
+        if f"{__name__}.windows" not in sys.modules:
             from . import windows  # noqa: F401
-        else:
-            from . import posix  # noqa: F401
+    elif f"{__name__}.posix" not in sys.modules:
+        from . import posix  # noqa: F401
@@ -1,19 +1,105 @@
 from atexit import register
-from os import environ
-from subprocess import PIPE, Popen, TimeoutExpired
-from sys import executable
+from contextlib import suppress
+from hashlib import sha1
+from os import environ, getuid
+from pathlib import Path
+from socket import AF_UNIX, SHUT_RDWR, SOCK_STREAM, socket
+from subprocess import DEVNULL, PIPE, Popen, TimeoutExpired
+from sys import executable, platform
+from threading import Thread
+from time import sleep
 
-from .main import run_reloader
+from .main import frame_header, run_reloader
 
 env = dict(environ)
 env["NO_HMR_DAEMON"] = "1"
-run_reloader(worker := Popen([executable, "-u", __file__.replace("__init__", "worker")], stdout=PIPE, env=env))
+worker_file = __file__.replace("__init__", "worker")
 
+if platform == "linux":
+    from socket import MSG_WAITALL, SO_PEERCRED, SOL_SOCKET
+    from struct import Struct
+    from warnings import warn
 
-@register
-def _():
-    worker.terminate()
-    try:
-        worker.wait(timeout=0.1)
-    except TimeoutExpired:
-        worker.kill()
+    # Share one resident worker per (interpreter, directory, watch settings) through an abstract UNIX socket,
+    # so starting another interpreter in the same project connects to it instead of paying the worker's startup again.
+    key = "\0".join((executable, str(Path.cwd()), environ.get("HMR_DAEMON_DEBOUNCE_MS", ""), environ.get("HMR_DAEMON_STEP_MS", "")))
+    name = f"hmr-daemon-{getuid()}-{sha1(key.encode(), usedforsecurity=False).hexdigest()[:16]}"
+    address = f"\0{name}"  # leading NUL selects the abstract namespace (no socket file to clean up)
+    connection: socket | None = None
+    ucred = Struct("3i")  # `struct ucred` returned by `SO_PEERCRED`: pid, uid, gid
+    NAME_IN_USE = 3  # worker exit status when a worker that is shutting down still holds the address, must match `worker.py`
+
+    def try_connect():
+        sock = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    def spawn_and_connect():
+        # No live worker yet: spawn one detached from this process (it exits once its last client disconnects)
+        for _ in range(5):
+            # the shared worker outlives this interpreter's daemon, so it must not keep writing to our stderr
+            worker = Popen([executable, "-u", worker_file, name], stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL, env=env, start_new_session=True)
+            # still our child: reap it whenever it exits, instead of leaving a zombie until this interpreter does
+            Thread(target=worker.wait, daemon=True, name="hmr-daemon-reaper").start()
+            for _ in range(500):  # it binds before importing anything heavy, so this ~5s budget only covers interpreter startup
+                sleep(0.01)
+                if (sock := try_connect()) is not None:
+                    return sock
+                if worker.poll() is not None:
+                    break
+            if worker.returncode != NAME_IN_USE:  # only a worker that lost the race for the address is worth replacing
+                return None
+        return None
+
+    def handshake(sock: socket):
+        # the worker sends an empty frame once it has registered us; EOF or a reset instead means we reached a worker
+        # that was shutting down (its last client left just as we connected), so the caller should try again
+        sock.settimeout(5)
+        try:
+            frame = sock.recv(frame_header.size + 2, MSG_WAITALL)
+        except OSError:
+            return False
+        sock.settimeout(None)
+        return frame == frame_header.pack(2) + b"[]"
+
+    def open_stream():
+        global connection
+        for _ in range(3):
+            if (sock := try_connect() or spawn_and_connect()) is None:
+                break
+            connection = sock
+            # abstract sockets have no file permissions, so make sure the worker runs as our own user before trusting its frames
+            if ucred.unpack(sock.getsockopt(SOL_SOCKET, SO_PEERCRED, ucred.size))[1] != getuid():
+                warn(f"hmr-daemon: {name!r} is served by another user, hot reloading is disabled for this process", RuntimeWarning, stacklevel=1)
+                return None
+            if handshake(sock):
+                return sock.makefile("rb")
+            sock.close()
+        warn("hmr-daemon: could not reach a watcher worker, hot reloading is disabled for this process", RuntimeWarning, stacklevel=1)
+        return None
+
+    def close():
+        if connection is None:
+            return
+        with suppress(OSError):
+            connection.shutdown(SHUT_RDWR)  # disconnect even though the stream returned above still references the socket
+        connection.close()
+
+    run_reloader(open_stream, close)
+
+else:
+    worker = Popen([executable, "-u", worker_file], stdout=PIPE, env=env)
+
+    @register
+    def _():
+        worker.terminate()
+        try:
+            worker.wait(timeout=0.1)
+        except TimeoutExpired:
+            worker.kill()
+
+    run_reloader(lambda: worker.stdout, _)
@@ -1,10 +1,11 @@
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from functools import wraps
 from os import getenv
 from pathlib import Path
-from subprocess import Popen, TimeoutExpired
+from struct import Struct
 from sys import argv
 from threading import Event, Thread, local
+from typing import IO
 
 from reactivity.hmr import __file__ as hmr_file
 from reactivity.hmr.core import BaseReloader, ErrorFilter, ReactiveModuleLoader, SyncReloader, patch_meta_path
@@ -25,6 +26,9 @@ def get_code(_: ReactiveModuleLoader, fullname: str):
 
 ReactiveModuleLoader.get_code = get_code  # pyright: ignore[reportAttributeAccessIssue]
 
+# Frame header written by the worker before each JSON payload (little-endian payload length)
+frame_header = Struct("<I")
+
 # Shared shutdown event (pipe reader thread stops when set)
 shutdown_event = Event()
 
@@ -54,8 +58,8 @@ def patch():
 
 
 class PipeReloader(SyncReloader):
-    def __init__(self, process: Popen):
-        self._process = process
+    def __init__(self, stream: IO[bytes]):
+        self._stream = stream
         self.includes = (".",)
         self.excludes = excludes
         self.error_filter = ErrorFilter(*map(str, Path(hmr_file, "..").resolve().glob("**/*.py")), __file__)
@@ -64,23 +68,21 @@ class PipeReloader(SyncReloader):
         from json import loads
 
         while not shutdown_event.is_set():
-            # Check if worker process is still alive
-            if self._process.poll() is not None:
-                # Worker process terminated
-                return
-
-            # Read data from pipe
+            # Read one length-prefixed frame from pipe (EOF means the worker terminated or disconnected us)
             try:
-                assert self._process.stdout is not None
-                line = self._process.stdout.readline()
-                if not line:  # EOF
+                header = self._stream.read(frame_header.size)
+                if len(header) < frame_header.size:  # EOF
+                    return
+                (size,) = frame_header.unpack(header)
+                payload = self._stream.read(size)
+                if len(payload) < size:  # EOF mid-frame
                     return
             except OSError:
                 # Pipe error
                 return
 
-            # Process events - each line is a complete events list
-            if events_data := loads(line.decode()):
+            # Process events - each frame is a complete events list
+            if events_data := loads(payload):
                 yield {(Change(event_int), path) for event_int, path in events_data}
 
     def start_watching(self):
@@ -89,31 +91,24 @@ class PipeReloader(SyncReloader):
                 return
             self.on_events(events)
 
-    def cleanup(self):
-        if self._process.poll() is None:
-            self._process.terminate()
-            try:
-                self._process.wait(timeout=0.1)
-            except TimeoutExpired:
-                self._process.kill()
-
 
-def _watch(process: Popen):
+def _watch(open_stream: Callable[[], IO[bytes] | None], close: Callable[[], None]):
     if shutdown_event.is_set():
         return
-    reloader = PipeReloader(process)
     try:
-        reloader.start_watching()
+        if (stream := open_stream()) is not None:
+            PipeReloader(stream).start_watching()
     finally:
-        reloader.cleanup()
+        close()
 
 
-def run_reloader(process: Popen):
+def run_reloader(open_stream: Callable[[], IO[bytes] | None], close: Callable[[], None]):
+    # `open_stream` runs in the daemon thread (it may wait for a worker to come up); `close` releases the worker afterwards
     state.disabled = True  # disable self-shutdown wrapper until first reloader init
 
     def watch():
         try:
-            _watch(process)
+            _watch(open_stream, close)
         finally:
             shutdown_event.set()
 
@@ -1,9 +1,11 @@
-from json import dumps
-from os import getenv
+from contextlib import suppress
+from json import JSONEncoder
+from os import getenv, getuid, write
 from signal import SIG_IGN, SIGINT, SIGTERM, signal
-from threading import Event
-
-from watchfiles import PythonFilter, watch
+from socket import AF_UNIX, SHUT_RDWR, SO_PEERCRED, SO_SNDTIMEO, SOCK_STREAM, SOL_SOCKET, socket
+from struct import Struct
+from sys import argv
+from threading import Event, Lock, Thread
 
 signal(SIGINT, SIG_IGN)
 
@@ -11,6 +13,105 @@ signal(SIGTERM, lambda *_: shutdown_event.set())
 
 shutdown_event = Event()
 
+header = Struct("<I")  # little-endian payload length, must match `main.py`
+encode = JSONEncoder(separators=(",", ":")).encode  # configured once instead of per `dumps` call
+
+NAME_IN_USE = 3  # exit status telling the spawning interpreter the address was still taken, must match `__init__.py`
+
+ucred = Struct("3i")  # `struct ucred` returned by `SO_PEERCRED`: pid, uid, gid
+
+if len(argv) > 1:
+    # Shared mode: serve frames to every interpreter connected to this socket, and exit when the last one leaves
+    server = socket(AF_UNIX, SOCK_STREAM)
+    try:
+        server.bind(f"\0{argv[1]}")  # abstract socket name, see `__init__.py`
+    except OSError:
+        raise SystemExit(NAME_IN_USE) from None  # another (possibly exiting) worker still holds this address
+    server.listen()
+    server.settimeout(5)  # give up if the spawning interpreter never connects
+
+    clients: list[socket] = []
+    clients_lock = Lock()
+    # a client that stops reading (e.g. SIGSTOP-ed with a full socket buffer) must not stall the others on this one watch thread;
+    # `SO_SNDTIMEO` bounds blocking sends only, so `track`'s blocking `recv` is unaffected
+    send_timeout = Struct("ll").pack(1, 0)  # `struct timeval`: 1s
+    hello = header.pack(2) + b"[]"  # an empty frame, sent once a client is registered, see `open_stream` in `__init__.py`
+
+    def stop_serving():
+        # must be called with `clients_lock` held, so `serve` can never register a client after this
+        shutdown_event.set()
+        with suppress(OSError):
+            server.shutdown(SHUT_RDWR)  # wakes `serve` out of `accept`
+        server.close()  # releases the abstract name right away, so the next interpreter can bind a fresh worker
+
+    def track(conn: socket):
+        with suppress(OSError):
+            while conn.recv(1):  # clients never send, so this only returns on disconnect
+                pass
+        with clients_lock:
+            clients.remove(conn)
+            if not clients:
+                stop_serving()
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:  # timed out waiting for the first client, or shut down after the last one left
+                with clients_lock:
+                    stop_serving()
+                return
+            # abstract sockets have no file permissions, so only serve interpreters running as our own user
+            if ucred.unpack(conn.getsockopt(SOL_SOCKET, SO_PEERCRED, ucred.size))[1] != getuid():
+                conn.close()
+                continue
+            server.settimeout(None)
+            conn.setsockopt(SOL_SOCKET, SO_SNDTIMEO, send_timeout)
+            with clients_lock:
+                if shutdown_event.is_set():  # accepted while the last client was leaving; its retry will spawn a fresh worker
+                    conn.close()
+                    return
+                try:
+                    conn.sendall(hello)
+                except OSError:
+                    conn.close()
+                    continue
+                clients.append(conn)
+            Thread(target=track, args=(conn,), daemon=True).start()
+
+    Thread(target=serve, daemon=True).start()
+
+    def send_to_clients(frame: bytes):
+        with clients_lock:
+            targets = [*clients]
+        for conn in targets:
+            try:
+                conn.sendall(frame)
+            except OSError:
+                # fell behind (see `send_timeout`) or went away; a partial frame would desync it anyway, so drop it:
+                # this wakes its `track` thread, which unregisters it, and the client sees EOF
+                with suppress(OSError):
+                    conn.shutdown(SHUT_RDWR)
+
+    emit = send_to_clients
+
+else:
+
+    def write_to_stdout(frame: bytes):
+        # raw write(2) on fd 1, bypassing the `sys.stdout` wrapper and its lock
+        try:
+            view = memoryview(frame)
+            while view:
+                view = view[write(1, view) :]
+        except OSError:  # includes BrokenPipeError
+            exit()  # Parent process disconnected
+
+    emit = write_to_stdout
+
+
+# imported only after binding above, so a cold import can't outlast the spawning interpreter's connect attempts
+from watchfiles import PythonFilter, watch  # noqa: E402
+
 debounce_ms: int | None = None
 step_ms: int | None = None
 try:
@@ -32,9 +133,6 @@ elif step_ms is not None and step_ms >= 1:
     watch_iter = watch(".", step=step_ms, **watch_base_kwargs)
 
 for events in watch_iter:
-    try:
-        # Serialize entire events set as JSON
-        events_data = [(int(event), path) for event, path in events]
-        print(dumps(events_data))
-    except (OSError, BrokenPipeError):
-        exit()  # Parent process disconnected
+    # watchfiles already coalesces a burst into one set (see `debounce`), so emit it as a single frame with one write
+    payload = encode([(int(event), path) for event, path in events]).encode()
+    emit(header.pack(len(payload)) + payload)
@@ -1,4 +1,4 @@
-from functools import wraps
+from functools import cache, wraps
 from os import getenv
 from pathlib import Path
 from sys import argv
@@ -22,6 +22,14 @@ def get_code(_: ReactiveModuleLoader, fullname: str):
 ReactiveModuleLoader.get_code = get_code  # pyright: ignore[reportAttributeAccessIssue]
 
 
+@cache
+def _watchfiles():
+    # imported lazily (this module runs at interpreter startup via the .pth hook) but only once
+    from watchfiles import PythonFilter, watch
+
+    return watch, PythonFilter()
+
+
 def patch():
     global original_init
 
@@ -48,7 +56,7 @@ def main():
             if shutdown_event.is_set():
                 return
 
-            from watchfiles import PythonFilter, watch
+            watch, python_filter = _watchfiles()
 
             if shutdown_event.is_set():
                 return
@@ -64,7 +72,7 @@ def main():
                 debounce_ms = None
                 step_ms = None
 
-            watch_base_kwargs = {"watch_filter": PythonFilter(), "stop_event": shutdown_event}
+            watch_base_kwargs = {"watch_filter": python_filter, "stop_event": shutdown_event}
             watch_iter = watch(".", **watch_base_kwargs)
             if debounce_ms is not None and debounce_ms >= 0 and step_ms is not None and step_ms >= 1:
                 watch_iter = watch(".", debounce=debounce_ms, step=step_ms, **watch_base_kwargs)
@@ -1,11 +1,17 @@
-from ._hub import send_reload_signal, subscription
-from ._runtime import INJECTION, RUNTIME_JS
+from typing import TYPE_CHECKING
+
+from . import _runtime
+from ._hub import async_subscription, send_reload_signal, subscription
 from .wsgi import RELOADER_PATH, wsgi_auto_refresh_middleware, wsgi_html_injection_middleware, wsgi_reloader_endpoint, wsgi_reloader_route_middleware
 
+if TYPE_CHECKING:
+    from ._runtime import INJECTION, RUNTIME_JS
+
 __all__ = [
     "INJECTION",
     "RELOADER_PATH",
     "RUNTIME_JS",
+    "async_subscription",
     "send_reload_signal",
     "subscription",
     "wsgi_auto_refresh_middleware",
@@ -13,3 +19,9 @@ __all__ = [
     "wsgi_reloader_endpoint",
     "wsgi_reloader_route_middleware",
 ]
+
+
+def __getattr__(name: str):
+    if name in {"INJECTION", "RUNTIME_JS"}:
+        return getattr(_runtime, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,39 +1,165 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from itertools import count
-from queue import Queue
-from threading import Lock
+from asyncio import AbstractEventLoop, QueueEmpty, get_running_loop
+from asyncio import Event as AsyncEvent
+from contextlib import contextmanager, suppress
+from queue import Empty
+from threading import Condition, Lock, Thread
+from time import sleep
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+HEARTBEAT_INTERVAL = 1  # seconds between the `0` keepalives every subscriber receives
+
+
+def _pulse(event: AsyncEvent) -> None:
+    # wakes every coroutine currently waiting on `event`, then re-arms it for the next broadcast
+    event.set()
+    event.clear()
+
 
 class _ReloadHub:
     def __init__(self) -> None:
-        self._lock = Lock()
-        self._next_id = count().__next__
-        self._subscribers: dict[int, Queue[int]] = {}
+        # Every broadcast or heartbeat swaps in a new `(seq, signal_seq, signal)` triple; subscribers only remember the last `seq`
+        # they have seen, so signalling costs the same regardless of how many clients are connected.
+        # A heartbeat only bumps `seq`, so it can never overwrite a signal that a subscriber has not read yet.
+        # Rebinding the tuple is atomic, so readers never need the lock; it only backs the condition blocking waiters sleep on.
+        self._cond = Condition(Lock())
+        self._state: tuple[int, int, int] = (0, 0, 0)
+        # One shared wake-up event per event loop that has async subscribers, with its subscriber count
+        self._loops: dict[AbstractEventLoop, tuple[AsyncEvent, int]] = {}
+        self._heartbeat: Thread | None = None
+        self._subscribers = 0  # sync and async subscriptions alike, keeps the heartbeat thread alive
+
+    def cursor(self) -> int:
+        # the `seq` a new subscriber starts from, so it only sees what is published after it subscribed
+        return self._state[0]
+
+    def poll(self, seen: int) -> tuple[int, int] | None:
+        seq, signal_seq, signal = self._state
+        if seq == seen:
+            return None
+        return seq, signal if signal_seq > seen else 0
+
+    def wait(self, seen: int, timeout: float | None = None) -> tuple[int, int] | None:
+        if (taken := self.poll(seen)) is not None:
+            return taken
+        with self._cond:
+            self._cond.wait_for(lambda: self._state[0] != seen, timeout)
+        return self.poll(seen)
+
+    def _ensure_heartbeat(self) -> None:
+        # must be called with `self._cond` held; a single timer thread serves every subscriber while there are any
+        if self._heartbeat is None:
+            self._heartbeat = Thread(target=self._beat, name="hmr-reloader-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _beat(self) -> None:
+        while True:
+            sleep(HEARTBEAT_INTERVAL)
+            with self._cond:
+                if not self._subscribers:  # last subscriber left: stop, the next `_ensure_heartbeat` starts a fresh thread
+                    self._heartbeat = None
+                    return
+                seq, signal_seq, signal = self._state
+                self._publish((seq + 1, signal_seq, signal))
+
+    def _publish(self, state: tuple[int, int, int]) -> None:
+        # must be called with `self._cond` held
+        self._state = state
+        self._cond.notify_all()
+        for loop, (event, _) in self._loops.items():
+            with suppress(RuntimeError):  # the loop is already closed
+                loop.call_soon_threadsafe(_pulse, event)
+
+    @contextmanager
+    def subscription(self) -> Iterator[Subscription]:
+        with self._cond:
+            self._subscribers += 1
+            self._ensure_heartbeat()
+        try:
+            yield Subscription(self)
+        finally:
+            with self._cond:
+                self._subscribers -= 1
 
     @contextmanager
-    def subscription(self) -> Iterator[Queue[int]]:
-        key = self._next_id()
-        q: Queue[int] = Queue()
-        with self._lock:
-            self._subscribers[key] = q
+    def async_subscription(self) -> Iterator[AsyncSubscription]:
+        loop = get_running_loop()
+        with self._cond:
+            self._subscribers += 1
+            self._ensure_heartbeat()
+            event, refs = self._loops.get(loop) or (AsyncEvent(), 0)
+            self._loops[loop] = (event, refs + 1)
         try:
-            yield q
+            yield AsyncSubscription(self, event)
         finally:
-            with self._lock:
-                if self._subscribers.get(key) is q:
-                    self._subscribers.pop(key, None)
+            with self._cond:
+                self._subscribers -= 1
+                event, refs = self._loops[loop]
+                if refs == 1:
+                    del self._loops[loop]
+                else:
+                    self._loops[loop] = (event, refs - 1)
 
     def broadcast(self, value: int) -> None:
-        with self._lock:
-            queues = list(self._subscribers.values())
-        for q in queues:
-            q.put_nowait(value)
+        with self._cond:
+            seq = self._state[0] + 1
+            self._publish((seq, seq, value))
+
+
+class Subscription:
+    """The consumer side of a `queue.Queue[int]`: `get` blocks until the next signal, or `0` on heartbeat."""
+
+    def __init__(self, hub: _ReloadHub) -> None:
+        self._hub = hub
+        self._seen = hub.cursor()
+
+    def get(self, block: bool = True, timeout: float | None = None) -> int:  # noqa: FBT001, FBT002
+        taken = self._hub.wait(self._seen, timeout) if block else self._hub.poll(self._seen)
+        if taken is None:
+            raise Empty
+        self._seen, value = taken
+        return value
+
+    def get_nowait(self) -> int:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return self._hub.poll(self._seen) is None
+
+    def qsize(self) -> int:
+        # only the latest value is kept, so at most one item is ever pending
+        return 0 if self.empty() else 1
+
+
+class AsyncSubscription:
+    """The consumer side of an `asyncio.Queue[int]`, see `Subscription`."""
+
+    def __init__(self, hub: _ReloadHub, event: AsyncEvent) -> None:
+        self._hub = hub
+        self._event = event
+        self._seen = hub.cursor()
+
+    async def get(self) -> int:
+        while (taken := self._hub.poll(self._seen)) is None:
+            await self._event.wait()
+        self._seen, value = taken
+        return value
+
+    def get_nowait(self) -> int:
+        if (taken := self._hub.poll(self._seen)) is None:
+            raise QueueEmpty
+        self._seen, value = taken
+        return value
+
+    def empty(self) -> bool:
+        return self._hub.poll(self._seen) is None
+
+    def qsize(self) -> int:
+        return 0 if self.empty() else 1
 
 
 hub = _ReloadHub()
@@ -44,6 +170,12 @@ def send_reload_signal() -> None:
 
 
 @contextmanager
-def subscription() -> Iterator[Queue[int]]:
+def subscription() -> Iterator[Subscription]:
     with hub.subscription() as q:
         yield q
+
+
+@contextmanager
+def async_subscription() -> Iterator[AsyncSubscription]:
+    with hub.async_subscription() as q:
+        yield q
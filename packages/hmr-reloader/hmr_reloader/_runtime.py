@@ -1,6 +1,32 @@
 from __future__ import annotations
 
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-RUNTIME_JS = Path(__file__).with_name("runtime.js").read_text("utf-8")
-INJECTION = f"\n\n<script>\n{RUNTIME_JS}\n</script>".encode()
+if TYPE_CHECKING:
+    RUNTIME_JS: str
+    INJECTION: bytes
+
+
+# Both constants are loaded on first access (PEP 562), so importing this package for signaling alone never reads `runtime.js`
+
+
+@cache
+def load_runtime_js() -> str:
+    return Path(__file__).with_name("runtime.js").read_text("utf-8")
+
+
+@cache
+def load_injection() -> bytes:
+    return f"\n\n<script>\n{load_runtime_js()}\n</script>".encode()
+
+
+_LAZY = {"RUNTIME_JS": load_runtime_js, "INJECTION": load_injection}
+
+
+def __getattr__(name: str):
+    if (loader := _LAZY.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value = loader()
+    return value
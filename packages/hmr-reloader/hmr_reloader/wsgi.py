@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from queue import Empty
+import sys
+from itertools import chain
 from typing import TYPE_CHECKING
 
 from ._hub import hub
-from ._runtime import INJECTION
+from ._runtime import load_injection
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable, Iterator
@@ -16,11 +17,19 @@ if TYPE_CHECKING:
 
 
 RELOADER_PATH = "/---fastapi-reloader---"
+_RELOADER_PATHS = frozenset({RELOADER_PATH, f"{RELOADER_PATH}/"})
 _FLAG = "hmr-reloader-injected"
+_CONTENT_TYPE = sys.intern("content-type")
+_CONTENT_ENCODING = sys.intern("content-encoding")
+_DROP_HEADERS = frozenset({sys.intern("content-length"), sys.intern("transfer-encoding")})
+# The usual spellings of the headers we inspect, mapped to their interned lowercase names so the common case skips `str.lower()`
+# and the comparisons below hit the identity fast path
+_KNOWN_HEADERS = {spelling: name for name in (_CONTENT_TYPE, _CONTENT_ENCODING, *_DROP_HEADERS) for spelling in (name, name.title(), name.upper())}
+_COALESCE_LIMIT = 64 * 1024
 
 
 def wsgi_reloader_endpoint(environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
-    method = str(environ.get("REQUEST_METHOD", "GET")).upper()
+    method = environ.get("REQUEST_METHOD", "GET")
     if method == "HEAD":
         start_response("202 Accepted", [], None)
         return []
@@ -35,11 +44,7 @@ def wsgi_reloader_endpoint(environ: Environ, start_response: StartResponse) -> I
         with hub.subscription() as q:
             yield b"0\n"
             while True:
-                try:
-                    value = q.get(timeout=1)
-                except Empty:
-                    yield b"0\n"
-                    continue
+                value = q.get()  # the hub sends a `0` heartbeat every second
                 yield f"{value}\n".encode()
                 if value == 1:
                     break
@@ -49,80 +54,110 @@ def wsgi_reloader_endpoint(environ: Environ, start_response: StartResponse) -> I
 
 def wsgi_reloader_route_middleware(app: WSGIApp) -> WSGIApp:
     def middleware(environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
-        path = str(environ.get("PATH_INFO", ""))
-        if path.rstrip("/") == RELOADER_PATH:
+        if environ.get("PATH_INFO") in _RELOADER_PATHS:
             return wsgi_reloader_endpoint(environ, start_response)
         return app(environ, start_response)
 
     return middleware
 
 
-def _get_header(headers: list[tuple[str, str]], name: str) -> str | None:
-    name = name.lower()
-    for k, v in headers:
-        if k.lower() == name:
-            return v
-    return None
+class _ClosingChain:
+    """Iterate several byte iterables back to back while forwarding `close()` to the upstream WSGI result (PEP 3333)."""
 
+    __slots__ = ("_close", "_iter")
 
-def wsgi_html_injection_middleware(app: WSGIApp) -> WSGIApp:
-    def middleware(environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
-        if environ.get(_FLAG):
-            return app(environ, start_response)
+    def __init__(self, result: Iterable[bytes], *parts: Iterable[bytes]) -> None:
+        self._iter = chain(*parts)
+        self._close = getattr(result, "close", None)
 
-        method = str(environ.get("REQUEST_METHOD", "GET")).upper()
-        path = str(environ.get("PATH_INFO", ""))
-        if method != "GET" or path.rstrip("/") == RELOADER_PATH:
-            return app(environ, start_response)
+    def __iter__(self) -> Iterator[bytes]:
+        return self._iter
+
+    def close(self) -> None:
+        if self._close is not None:
+            self._close()
+
+
+def _inject(app: WSGIApp, environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
+    status_line: str | None = None
+    response_headers: list[tuple[str, str]] | None = None
+    exc: TracebackType | None = None
+    body_prefix: list[bytes] = []
+
+    def sr(status: str, headers: list[tuple[str, str]], exc_info: TracebackType | None = None):
+        nonlocal status_line, response_headers, exc
+        status_line = status
+        response_headers = headers
+        exc = exc_info
+
+        def write(data: bytes):
+            body_prefix.append(data)
+            return None
 
-        status_line: str | None = None
-        response_headers: list[tuple[str, str]] | None = None
-        exc: TracebackType | None = None
-        body_prefix: list[bytes] = []
+        return write
 
-        def sr(status: str, headers: list[tuple[str, str]], exc_info: TracebackType | None = None):
-            nonlocal status_line, response_headers, exc
-            status_line = status
-            response_headers = list(headers)
-            exc = exc_info
+    result = app(environ, sr)
 
-            def write(data: bytes):
-                body_prefix.append(data)
-                return None
+    if status_line is None or response_headers is None:
+        return result
 
-            return write
+    # single pass: read the first content-type / content-encoding and collect the headers to keep if we inject
+    content_type: str | None = None
+    content_encoding: str | None = None
+    filtered_headers: list[tuple[str, str]] = []
+    for k, v in response_headers:
+        lk = _KNOWN_HEADERS.get(k) or k.lower()
+        if lk == _CONTENT_TYPE:
+            if content_type is None:
+                content_type = v
+        elif lk == _CONTENT_ENCODING:
+            if content_encoding is None:
+                content_encoding = v
+        elif lk in _DROP_HEADERS:
+            continue
+        filtered_headers.append((k, v))
 
-        result = app(environ, sr)
+    should_inject = ("html" in (content_type or "").lower()) and (content_encoding or "identity").lower() == "identity"
 
-        if status_line is None or response_headers is None:
-            return result
+    if not should_inject:
+        start_response(status_line, response_headers, exc)
+        return result
 
-        content_type = (_get_header(response_headers, "content-type") or "").lower()
-        content_encoding = (_get_header(response_headers, "content-encoding") or "identity").lower()
-        should_inject = ("html" in content_type) and content_encoding == "identity"
+    environ[_FLAG] = True
 
-        if not should_inject:
-            start_response(status_line, response_headers, exc)
-            return result
+    if isinstance(result, (list, tuple)):
+        # an already materialized body: if it's small, send it as one chunk with a correct content-length instead of streaming
+        injection = load_injection()
+        size = sum(map(len, body_prefix)) + sum(map(len, result)) + len(injection)
+        if size <= _COALESCE_LIMIT:  # size it up first, so a large body is never joined just to be thrown away
+            data = b"".join((*body_prefix, *result, injection))
+            if (close := getattr(result, "close", None)) is not None:  # PEP 3333: list subclasses may define `close` too
+                close()
+            start_response(status_line, [*filtered_headers, ("Content-Length", str(size))], exc)
+            return [data]
 
-        environ[_FLAG] = True
-        filtered_headers = [(k, v) for (k, v) in response_headers if k.lower() not in {"content-length", "transfer-encoding"}]
-        start_response(status_line, filtered_headers, exc)
+    start_response(status_line, filtered_headers, exc)
 
-        def response() -> Iterator[bytes]:
-            try:
-                yield from body_prefix
-                yield from result
-                yield INJECTION
-            finally:
-                close = getattr(result, "close", None)
-                if close is not None:
-                    close()
+    return _ClosingChain(result, body_prefix, result, (load_injection(),))
 
-        return response()
+
+def wsgi_html_injection_middleware(app: WSGIApp) -> WSGIApp:
+    def middleware(environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
+        # non-candidates go straight upstream before any capture state is allocated
+        if environ.get("REQUEST_METHOD", "GET") != "GET" or environ.get(_FLAG) or environ.get("PATH_INFO") in _RELOADER_PATHS:
+            return app(environ, start_response)
+        return _inject(app, environ, start_response)
 
     return middleware
 
 
 def wsgi_auto_refresh_middleware(app: WSGIApp) -> WSGIApp:
-    return wsgi_html_injection_middleware(wsgi_reloader_route_middleware(app))
+    # equivalent to `wsgi_html_injection_middleware(wsgi_reloader_route_middleware(app))`, flattened into one frame per request
+    def middleware(environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
+        if environ.get("PATH_INFO") in _RELOADER_PATHS:
+            return wsgi_reloader_endpoint(environ, start_response)
+        if environ.get("REQUEST_METHOD", "GET") != "GET" or environ.get(_FLAG):
+            return app(environ, start_response)
+        return _inject(app, environ, start_response)
+
+    return middleware
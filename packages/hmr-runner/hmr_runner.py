@@ -1,10 +1,19 @@
-import inspect
+import sys
 from collections.abc import Awaitable, Callable, Iterable
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from fnmatch import fnmatch
+from fnmatch import translate
+from functools import lru_cache
+from inspect import isawaitable
+from os import getcwd, sep
+from os import name as os_name
+from os.path import normcase
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, override
+from re import IGNORECASE, Pattern
+from re import compile as re_compile
+from stat import S_ISDIR
+from types import CoroutineType
+from typing import TYPE_CHECKING, Any, TypeGuard, override
 
 
 @dataclass(frozen=True, slots=True)
@@ -18,6 +27,10 @@ RELOAD_REASON_TRACKED_FILE = "tracked-file"
 RELOAD_REASON_EXTRA_WATCH_FILE = "extra-watch-file"
 RELOAD_REASON_ASSET_REFRESH = "asset-refresh"
 
+_RELOAD_REASONS = (RELOAD_REASON_CODE, RELOAD_REASON_TRACKED_FILE, RELOAD_REASON_EXTRA_WATCH_FILE, RELOAD_REASON_ASSET_REFRESH)
+# every combination of the reasons above, indexed by a bitmask with bit `i` set when `_RELOAD_REASONS[i]` applies
+_REASON_SETS = tuple(frozenset(r for i, r in enumerate(_RELOAD_REASONS) if mask >> i & 1) for mask in range(1 << len(_RELOAD_REASONS)))
+
 
 @dataclass(frozen=True, slots=True)
 class HMRConfig:
@@ -57,54 +70,127 @@ class HMRHooks:
     on_server_stopped: ServerHook | None = None
 
 
-async def _call_hook(logger, hook_name: str, hook: Callable[..., HookReturn] | None, *args: Any) -> None:
-    if hook is None:
-        return
+def _is_awaitable(obj: object) -> TypeGuard[Awaitable[Any]]:
+    # `inspect.isawaitable` ends in an ABC `isinstance` check, so answer the common cases (native coroutines, objects with
+    # `__await__`, plain `None`) without it; only what's left, like `@types.coroutine` generators, falls through to it
+    t = type(obj)
+    if t is CoroutineType or hasattr(t, "__await__"):
+        return True
+    return obj is not None and isawaitable(obj)
+
+
+# callers skip unset hooks themselves (`if hooks.<name> is not None:`), so no coroutine is built just to return early
+async def _call_hook(logger, hook_name: str, hook: Callable[..., HookReturn], *args: Any) -> None:
     try:
         res = hook(*args)
-        if inspect.isawaitable(res):
+        if _is_awaitable(res):
             await res
     except Exception:
         logger.exception("Hook '%s' failed", hook_name)
 
 
+async def _await_hook(logger, hook_name: str, res: Awaitable[None]) -> None:
+    try:
+        await res
+    except Exception:
+        logger.exception("Hook '%s' failed", hook_name)
+
+
+# like `_call_hook`, but a sync hook runs inline and a coroutine is only returned if the hook handed back an awaitable
+def _fire_hook(logger, hook_name: str, hook: Callable[..., HookReturn], *args: Any) -> Awaitable[None] | None:
+    try:
+        res = hook(*args)
+    except Exception:
+        logger.exception("Hook '%s' failed", hook_name)
+        return None
+    return _await_hook(logger, hook_name, res) if _is_awaitable(res) else None
+
+
 def _display_path(path: str | Path) -> str:
+    return _display_path_from(str(path), getcwd())  # noqa: PTH109  # a plain `str` key, no `Path` built and hashed per call
+
+
+@lru_cache(maxsize=512)  # bursts of edits log the same files over and over; cwd is part of the key so `chdir` can't serve stale results
+def _display_path_from(path: str, cwd: str) -> str:
     p = Path(path).resolve()
     try:
-        return f"'{p.relative_to(Path.cwd())}'"
+        return f"'{p.relative_to(cwd)}'"
     except ValueError:
         return f"'{p}'"
 
 
+# the `.py` file a dotted module name would be loaded from, found without importing the module or any of its parent packages
+def find_module_source(module: str) -> Path:
+    # walk the dotted name with `PathFinder` itself: it reuses the cached directory listings of the path finders instead of
+    # stat-ing every `sys.path` entry, and unlike `importlib.util.find_spec` it never imports the parent packages
+    from importlib.machinery import PathFinder
+
+    name, search_path, spec = "", ["", *sys.path], None
+    for part in module.split("."):
+        if search_path is None:  # the previous part is a plain module, not a package
+            spec = None
+            break
+        name = f"{name}.{part}" if name else part
+        try:
+            spec = PathFinder.find_spec(name, search_path)
+        except KeyError:  # a namespace package nested in another one looks its parent up in `sys.modules`, so list its portions by hand
+            spec, search_path = None, [str(d) for d in (Path(p, part) for p in search_path) if d.is_dir()]
+            continue
+        if spec is None:
+            break
+        search_path = spec.submodule_search_locations
+
+    if spec is None or not spec.has_location or spec.origin is None:
+        raise ModuleNotFoundError(f"Module {module!r} not found on sys.path")
+
+    origin = Path(spec.origin)
+    if origin.suffix != ".py":
+        # `PathFinder` prefers an extension module over a source file and accepts a sourceless `.pyc`; only a `.py` can be hot-reloaded
+        origin = origin.with_name("__init__.py" if spec.submodule_search_locations is not None else f"{part}.py")
+        if not origin.is_file():
+            raise ModuleNotFoundError(f"Module {module!r} not found on sys.path")
+
+    return origin.resolve()
+
+
+_logging_loads: set[Callable[..., Any]] = set()  # the `patched_load`s currently installed
+
+
 @contextmanager
 def _patch_reactive_module_load_logging(*, logger):
-    from functools import wraps
-
     from reactivity.hmr.core import ReactiveModule
     from reactivity.hmr.utils import on_dispose
 
     __load = ReactiveModule.__load if TYPE_CHECKING else ReactiveModule._ReactiveModule__load  # noqa: SLF001
 
-    @wraps(original_load := __load.method)
-    def patched_load(self: ReactiveModule, *args: Any, **kwargs: Any):
+    if __load.method in _logging_loads:  # an enclosing run already logs module loads, don't stack another wrapper on top
+        yield
+        return
+
+    original_load = __load.method
+    info = logger.info
+
+    def patched_load(self: ReactiveModule, *args: Any, **kwargs: Any):  # internal wrapper, no need to copy metadata with `wraps`
         try:
             original_load(self, *args, **kwargs)
         finally:
             file: Path = self._ReactiveModule__file  # type: ignore[attr-defined]
-            on_dispose(lambda: logger.info("Reloading module '%s' from %s", self.__name__, _display_path(file)), str(file))
+            on_dispose(lambda: info("Reloading module '%s' from %s", self.__name__, _display_path(file)), str(file))
 
     __load.method = patched_load
+    _logging_loads.add(patched_load)
     try:
         yield
     finally:
         __load.method = original_load
+        _logging_loads.discard(patched_load)
 
 
-_GLOB_CHARS = frozenset({"*", "?", "["})
+_GLOB_CHAR_RE = re_compile(r"[*?\[]")  # finds the first glob character in a single pass
 
 
 def _is_glob(s: str) -> bool:
-    return any(c in s for c in _GLOB_CHARS)
+    return _GLOB_CHAR_RE.search(s) is not None
 
 
 @dataclass(frozen=True, slots=True)
@@ -116,53 +202,78 @@ class _Glob:
 @dataclass(frozen=True, slots=True)
 class _CompiledAssetSpec:
     cwd: Path
-    include_dir_roots: tuple[Path, ...]
+    include_dir_roots: tuple[str, ...]  # see `_dir_prefixes`
     include_files: frozenset[Path]
-    include_globs: tuple[_Glob, ...]
-    exclude_dir_roots: tuple[Path, ...]
+    include_abs_globs: Pattern[str] | None
+    include_rel_globs: Pattern[str] | None
+    exclude_dir_roots: tuple[str, ...]
     exclude_files: frozenset[Path]
-    exclude_globs: tuple[_Glob, ...]
+    exclude_abs_globs: Pattern[str] | None
+    exclude_rel_globs: Pattern[str] | None
     watch_paths: tuple[Path, ...]
 
     def matches(self, path: Path) -> bool:
-        if path.suffix == ".py":
+        if path.name.endswith(".py"):
             return False
 
-        if not self._matches_any_include(path):
+        # stringify the path once and share the results between the include and exclude checks
+        key = _fold_case(f"{path}{sep}")  # see `_is_under`
+        posix = path.as_posix()
+        rel_posix = self._relative_posix(path) if self.include_rel_globs or self.exclude_rel_globs else None
+
+        if not self._matches_any_include(path, key, posix, rel_posix):
             return False
 
-        return not self._matches_any_exclude(path)
+        return not self._matches_any_exclude(path, key, posix, rel_posix)
 
-    def _matches_any_include(self, path: Path) -> bool:
+    def _matches_any_include(self, path: Path, key: str, posix: str, rel_posix: str | None) -> bool:
         if self.include_files and path in self.include_files:
             return True
-        if self.include_dir_roots and any(path.is_relative_to(root) for root in self.include_dir_roots):
+        if self.include_dir_roots and key.startswith(self.include_dir_roots):
             return True
-        return self._matches_any_glob(path, self.include_globs)
+        return _matches_any_glob(posix, rel_posix, self.include_abs_globs, self.include_rel_globs)
 
-    def _matches_any_exclude(self, path: Path) -> bool:
+    def _matches_any_exclude(self, path: Path, key: str, posix: str, rel_posix: str | None) -> bool:
         if self.exclude_files and path in self.exclude_files:
             return True
-        if self.exclude_dir_roots and any(path.is_relative_to(root) for root in self.exclude_dir_roots):
+        if self.exclude_dir_roots and key.startswith(self.exclude_dir_roots):
             return True
-        return self._matches_any_glob(path, self.exclude_globs)
-
-    def _matches_any_glob(self, path: Path, globs: tuple[_Glob, ...]) -> bool:
-        if not globs:
-            return False
+        return _matches_any_glob(posix, rel_posix, self.exclude_abs_globs, self.exclude_rel_globs)
 
-        abs_posix = path.as_posix()
-        rel_posix: str | None
+    def _relative_posix(self, path: Path) -> str | None:
         try:
-            rel_posix = path.relative_to(self.cwd).as_posix()
+            return path.relative_to(self.cwd).as_posix()
         except ValueError:
-            rel_posix = None
+            return None
+
+
+def _matches_any_glob(posix: str, rel_posix: str | None, abs_globs: Pattern[str] | None, rel_globs: Pattern[str] | None) -> bool:
+    if abs_globs is not None and abs_globs.match(posix):
+        return True
+    return rel_globs is not None and rel_posix is not None and rel_globs.match(rel_posix) is not None
+
+
+# `fnmatch.fnmatch` normcases both sides, which makes matching case-insensitive on Windows
+_GLOB_FLAGS = IGNORECASE if os_name == "nt" else 0
+
+
+def _compile_globs(globs: Iterable[_Glob], *, absolute: bool) -> Pattern[str] | None:
+    # one alternation per kind, so each path costs a single regex match instead of one `fnmatch` call per glob
+    patterns = [translate(g.pattern) for g in globs if g.absolute is absolute]
+    return re_compile("|".join(patterns), _GLOB_FLAGS) if patterns else None
 
-        for g in globs:
-            candidate = abs_posix if g.absolute else rel_posix
-            if candidate is not None and fnmatch(candidate, g.pattern):
-                return True
-        return False
+
+# Windows paths compare case-insensitively (as `PureWindowsPath.is_relative_to` does); elsewhere `str` is a no-op on a `str`
+_fold_case: Callable[[str], str] = normcase if os_name == "nt" else str
+
+
+def _dir_prefixes(paths: Iterable[Path]) -> tuple[str, ...]:
+    return tuple(s if s.endswith(sep) else f"{s}{sep}" for s in map(_fold_case, map(str, paths)))
+
+
+def _is_under(path: Path, prefixes: tuple[str, ...]) -> bool:
+    # same answer as `any(path.is_relative_to(root) for root in roots)` for resolved paths, but a single C-level `str.startswith`
+    return _fold_case(f"{path}{sep}").startswith(prefixes)
 
 
 def _nearest_existing_dir(path: Path) -> Path | None:
@@ -176,16 +287,72 @@ def _nearest_existing_dir(path: Path) -> Path | None:
         cur = parent
 
 
-def _glob_base_dir(pattern: str) -> Path:
-    idx = min((pattern.find(c) for c in _GLOB_CHARS if c in pattern), default=-1)
-    if idx <= 0:
-        return Path.cwd()
+def _glob_base_dir(pattern: str, cwd: Path) -> Path:
+    m = _GLOB_CHAR_RE.search(pattern)
+    if m is None or m.start() == 0:
+        return cwd
+
+    prefix = pattern[: m.start()]
+    cut = max(prefix.rfind("/"), prefix.rfind("\\"))  # keep the separator so a root like "/" survives
+    return Path(prefix[: cut + 1]) if cut >= 0 else cwd
 
-    prefix = pattern[:idx]
-    base = Path(prefix)
-    if prefix and not prefix.endswith(("/", "\\")):
-        base = base.parent
-    return base
+
+def _add_path_spec(spec: str, cwd: Path, *, to_dirs: list[Path], to_files: set[Path], watch_paths: list[Path] | None, logger) -> None:
+    p = Path(spec).expanduser()
+    if not p.is_absolute():
+        p = cwd / p
+    p = p.resolve()
+
+    # one stat answers both "does it exist" and "is it a directory"
+    try:
+        mode = p.stat().st_mode
+    except OSError:
+        mode = None
+
+    if mode is not None:
+        if S_ISDIR(mode):
+            to_dirs.append(p)
+        else:
+            to_files.add(p)
+        if watch_paths is not None:
+            watch_paths.append(p)
+        return
+
+    if spec.endswith(("/", "\\")) or Path(spec).suffix == "":
+        to_dirs.append(p)
+        if watch_paths is not None:
+            parent = _nearest_existing_dir(p)
+            if parent is not None:
+                watch_paths.append(parent)
+            else:
+                logger.warning("Asset refresh include path does not exist and has no existing parent: %s", _display_path(p))
+        return
+
+    to_files.add(p)
+    if watch_paths is not None:
+        parent = _nearest_existing_dir(p.parent)
+        if parent is not None:
+            watch_paths.append(parent)
+        else:
+            logger.warning("Asset refresh include file does not exist and has no existing parent: %s", _display_path(p))
+
+
+def _add_glob_spec(spec: str, cwd: Path, *, to_globs: list[_Glob], watch_paths: list[Path] | None, logger) -> None:
+    expanded = str(Path(spec).expanduser())
+    absolute = Path(expanded).is_absolute()
+    pattern = Path(expanded).as_posix() if absolute else expanded.replace("\\", "/")
+    to_globs.append(_Glob(pattern=pattern, absolute=absolute))
+
+    if watch_paths is not None:
+        base_dir = _glob_base_dir(expanded, cwd)
+        if not base_dir.is_absolute():
+            base_dir = cwd / base_dir
+        base_dir = base_dir.resolve()
+        existing = _nearest_existing_dir(base_dir)
+        if existing is not None:
+            watch_paths.append(existing)
+        else:
+            logger.warning("Asset refresh glob has no existing base directory to watch: %s", spec)
 
 
 def _compile_asset_spec(*, include: list[str], exclude: list[str], cwd: Path, logger) -> _CompiledAssetSpec | None:
@@ -202,87 +369,29 @@ def _compile_asset_spec(*, include: list[str], exclude: list[str], cwd: Path, lo
 
     watch_paths: list[Path] = []
 
-    def add_path_spec(spec: str, *, to_dirs: list[Path], to_files: set[Path], watch: bool) -> None:
-        raw = spec
-        p = Path(spec).expanduser()
-        if not p.is_absolute():
-            p = cwd / p
-        p = p.resolve()
-
-        is_dir_hint = raw.endswith(("/", "\\")) or Path(raw).suffix == ""
-        if p.exists():
-            if p.is_dir():
-                to_dirs.append(p)
-                if watch:
-                    watch_paths.append(p)
-                return
-            to_files.add(p)
-            if watch:
-                watch_paths.append(p)
-            return
-
-        if is_dir_hint:
-            to_dirs.append(p)
-            if watch:
-                parent = _nearest_existing_dir(p)
-                if parent is not None:
-                    watch_paths.append(parent)
-                else:
-                    logger.warning("Asset refresh include path does not exist and has no existing parent: %s", _display_path(p))
-            return
-
-        to_files.add(p)
-        if watch:
-            parent = _nearest_existing_dir(p.parent)
-            if parent is not None:
-                watch_paths.append(parent)
-            else:
-                logger.warning("Asset refresh include file does not exist and has no existing parent: %s", _display_path(p))
-
-    def add_glob_spec(spec: str, *, to_globs: list[_Glob], watch: bool) -> None:
-        expanded = str(Path(spec).expanduser())
-        absolute = Path(expanded).is_absolute()
-        pattern = Path(expanded).as_posix() if absolute else expanded.replace("\\", "/")
-        to_globs.append(_Glob(pattern=pattern, absolute=absolute))
-
-        if watch:
-            base_dir = _glob_base_dir(expanded)
-            if not base_dir.is_absolute():
-                base_dir = cwd / base_dir
-            base_dir = base_dir.resolve()
-            existing = _nearest_existing_dir(base_dir)
-            if existing is not None:
-                watch_paths.append(existing)
-            else:
-                logger.warning("Asset refresh glob has no existing base directory to watch: %s", spec)
-
     for spec in include:
         if _is_glob(spec):
-            add_glob_spec(spec, to_globs=include_globs, watch=True)
+            _add_glob_spec(spec, cwd, to_globs=include_globs, watch_paths=watch_paths, logger=logger)
         else:
-            add_path_spec(spec, to_dirs=include_dir_roots, to_files=include_files, watch=True)
+            _add_path_spec(spec, cwd, to_dirs=include_dir_roots, to_files=include_files, watch_paths=watch_paths, logger=logger)
 
     for spec in exclude:
         if _is_glob(spec):
-            add_glob_spec(spec, to_globs=exclude_globs, watch=False)
+            _add_glob_spec(spec, cwd, to_globs=exclude_globs, watch_paths=None, logger=logger)
         else:
-            add_path_spec(spec, to_dirs=exclude_dir_roots, to_files=exclude_files, watch=False)
-
-    def uniq_paths(paths: Iterable[Path]) -> tuple[Path, ...]:
-        dedup: dict[Path, None] = {}
-        for p in paths:
-            dedup[p] = None
-        return tuple(dedup.keys())
+            _add_path_spec(spec, cwd, to_dirs=exclude_dir_roots, to_files=exclude_files, watch_paths=None, logger=logger)
 
     return _CompiledAssetSpec(
         cwd=cwd,
-        include_dir_roots=tuple(include_dir_roots),
+        include_dir_roots=_dir_prefixes(include_dir_roots),
         include_files=frozenset(include_files),
-        include_globs=tuple(include_globs),
-        exclude_dir_roots=tuple(exclude_dir_roots),
+        include_abs_globs=_compile_globs(include_globs, absolute=True),
+        include_rel_globs=_compile_globs(include_globs, absolute=False),
+        exclude_dir_roots=_dir_prefixes(exclude_dir_roots),
         exclude_files=frozenset(exclude_files),
-        exclude_globs=tuple(exclude_globs),
-        watch_paths=uniq_paths(watch_paths),
+        exclude_abs_globs=_compile_globs(exclude_globs, absolute=True),
+        exclude_rel_globs=_compile_globs(exclude_globs, absolute=False),
+        watch_paths=tuple(dict.fromkeys(watch_paths)),
     )
 
 
@@ -299,13 +408,14 @@ async def run_with_hmr_async(
     refresh_callback: Callable[[], Any] | None = None,
     force_restart_files: set[Path] | None = None,
 ) -> None:
-    from asyncio import CancelledError, Event, ensure_future, sleep
+    from asyncio import CancelledError, Event, Task, ensure_future, get_running_loop, sleep
     from logging import getLogger
     from time import monotonic
 
-    from reactivity.hmr.core import HMR_CONTEXT, AsyncReloader, ReactiveModule, is_relative_to_any
+    from reactivity.hmr.core import HMR_CONTEXT, AsyncReloader, ReactiveModule
     from reactivity.hmr.fs import fs_signals, track
     from reactivity.hmr.hooks import call_post_reload_hooks, call_pre_reload_hooks
+    from watchfiles import awatch
 
     logger = getLogger(logger_name)
     hmr = hmr or HMRConfig()
@@ -319,13 +429,19 @@ async def run_with_hmr_async(
     refresh_enabled = refresh_cb is not None
     asset_spec = _compile_asset_spec(include=hmr.asset_refresh_include, exclude=hmr.asset_refresh_exclude, cwd=cwd, logger=logger) if refresh_enabled else None
 
-    finish = Event()
+    finish = Event()  # replaced for every server generation below
     manage_ready_event = server_ready_event is None
     server_ready_event = server_ready_event or Event()
 
-    extra_watch_files = [*{p.expanduser().resolve(): None for p in hmr.extra_watch_files if p.expanduser().exists()}]
-    extra_watch_set = set(extra_watch_files)
-    force_restart_set = {p.resolve() for p in (force_restart_files or set())}
+    extra_watch_seen: dict[Path, None] = {}  # ordered and deduplicated
+    for p in hmr.extra_watch_files:
+        try:
+            extra_watch_seen[p.expanduser().resolve(strict=True)] = None  # strict resolution doubles as the existence check
+        except OSError:
+            continue
+    extra_watch_files = [*extra_watch_seen]
+    extra_watch_set = frozenset(extra_watch_files)
+    force_restart_set = frozenset(p.resolve() for p in force_restart_files or ())
 
     need_restart = True
     server: Any | None = None
@@ -337,22 +453,26 @@ async def run_with_hmr_async(
             self.error_filter.exclude_filenames.add(__file__)  # exclude error stacks within this file
             self.ready = Event()
             self._run = HMR_CONTEXT.async_derived(self.__run)
-            self._pending_reload: ReloadInfo | None = None
-            self._hook_tasks: set[Any] = set()
+            # accumulated in place during a burst and frozen once when the reload starts, so K batches cost O(K) instead of O(K²)
+            self._pending_files: set[Path] = set()
+            self._pending_reasons: set[str] = set()
+            self._hook_tasks: list[Any] = []  # strong refs so pending hook tasks aren't garbage collected
+            # includes and excludes never change, so resolve them once instead of on every reload
+            self._watched_paths = [Path(p).resolve() for p in self.includes]
+            self._watched_prefixes = _dir_prefixes(self._watched_paths)
+            self._ignored_prefixes = _dir_prefixes(Path(p).resolve() for p in self.excludes)
+            # clearing only makes sense on a terminal; piped / captured output would just collect escape codes
+            self._clear_screen = hmr.clear and sys.stdout is not None and sys.stdout.isatty()
 
         def _merge_reload_info(self, info: ReloadInfo) -> None:
-            if self._pending_reload is None:
-                self._pending_reload = info
-                return
-            self._pending_reload = ReloadInfo(
-                files=frozenset(set(self._pending_reload.files) | set(info.files)),
-                reasons=frozenset(set(self._pending_reload.reasons) | set(info.reasons)),
-            )
+            self._pending_files |= info.files
+            self._pending_reasons |= info.reasons
 
         def _drain_reload_info(self) -> ReloadInfo:
-            info = self._pending_reload
-            self._pending_reload = None
-            return info or ReloadInfo(files=frozenset(), reasons=frozenset())
+            info = ReloadInfo(files=frozenset(self._pending_files), reasons=frozenset(self._pending_reasons))
+            self._pending_files.clear()
+            self._pending_reasons.clear()
+            return info
 
         async def __run(self):
             nonlocal server
@@ -363,11 +483,13 @@ async def run_with_hmr_async(
                     logger.warning("Application '%s' has changed. Restarting server...", name)
                 self.ready.clear()
                 await server_ready_event.wait()
-                old_server = server
-                await _call_hook(logger, "before_shutdown", hooks.before_shutdown, old_server, info)
+                old_server, old_finish = server, finish
+                if hooks.before_shutdown is not None:
+                    await _call_hook(logger, "before_shutdown", hooks.before_shutdown, old_server, info)
                 old_server.should_exit = True
-                await finish.wait()
-                await _call_hook(logger, "after_shutdown", hooks.after_shutdown, old_server, info)
+                await old_finish.wait()
+                if hooks.after_shutdown is not None:
+                    await _call_hook(logger, "after_shutdown", hooks.after_shutdown, old_server, info)
 
             cancelled: CancelledError | None = None
             with self.error_filter:
@@ -375,18 +497,19 @@ async def run_with_hmr_async(
                     for p in extra_watch_files:
                         track(p)
 
-                    await _call_hook(logger, "before_reload", hooks.before_reload, info)
+                    if hooks.before_reload is not None:
+                        await _call_hook(logger, "before_reload", hooks.before_reload, info)
 
                     app = load_app()
-                    if inspect.isawaitable(app):
+                    if isawaitable(app):  # once per restart, so the full check costs nothing
                         app = await app
                     self.app = app
 
-                    await _call_hook(logger, "after_reload", hooks.after_reload, self.app, info)
+                    if hooks.after_reload is not None:
+                        await _call_hook(logger, "after_reload", hooks.after_reload, self.app, info)
 
-                    watched_paths = [Path(p).resolve() for p in self.includes]
-                    ignored_paths = [Path(p).resolve() for p in self.excludes]
-                    if all(is_relative_to_any(path, ignored_paths) or not is_relative_to_any(path, watched_paths) for path in ReactiveModule.instances):
+                    watched, ignored = self._watched_prefixes, self._ignored_prefixes
+                    if all(_is_under(path, ignored) or not _is_under(path, watched) for path in ReactiveModule.instances):
                         logger.error("No files to watch for changes. The server will never reload.")
                 except CancelledError as e:
                     cancelled = e
@@ -418,18 +541,17 @@ async def run_with_hmr_async(
 
         async def start_watching(self):
             await server_ready_event.wait()
-            from watchfiles import awatch
 
             watch_paths: list[str] = [self.entry, *self.includes]
-            roots = [Path(p).resolve() for p in watch_paths]
+            roots = _dir_prefixes(r for r in (Path(self.entry).resolve(), *self._watched_paths) if r.is_dir())
 
             for p in extra_watch_files:
-                if not any(p.is_relative_to(r) for r in roots if r.is_dir()):
+                if not _is_under(p, roots):
                     watch_paths.append(str(p))
 
             if asset_spec is not None:
                 for p in asset_spec.watch_paths:
-                    if not any(p.is_relative_to(r) for r in roots if r.is_dir()):
+                    if not _is_under(p, roots):
                         watch_paths.append(str(p))
 
             awatch_kwargs: dict[str, Any] = {"stop_event": self._stop_event}
@@ -446,20 +568,38 @@ async def run_with_hmr_async(
         def _schedule_task(self, coro_or_none: Any) -> None:
             if coro_or_none is None:
                 return
-            if inspect.isawaitable(coro_or_none):
-                task = ensure_future(coro_or_none)
-                self._hook_tasks.add(task)
-                task.add_done_callback(self._hook_tasks.discard)
+            if _is_awaitable(coro_or_none):
+                if type(coro_or_none) is CoroutineType:
+                    # hooks mostly finish without ever suspending; starting them eagerly skips a trip through the ready queue
+                    task = Task(coro_or_none, loop=get_running_loop(), eager_start=True)
+                    if task.done():
+                        return
+                else:
+                    task = ensure_future(coro_or_none)
+                if len(self._hook_tasks) >= 32:  # prune in bulk rather than registering a done callback per task
+                    self._hook_tasks[:] = [t for t in self._hook_tasks if not t.done()]
+                self._hook_tasks.append(task)
 
         @override
         def on_changes(self, files: set[Path]):
-            tracked_hits = files.intersection(path for path, s in fs_signals.items() if s.subscribers)
-            code_hits = files.intersection(ReactiveModule.instances)
-            extra_hits = files.intersection(extra_watch_set) if extra_watch_set else set()
+            # classify the (small) batch of changed files in one pass instead of walking every signal / loaded module;
+            # `.get` keeps a defaultdict-backed registry from growing entries for untracked paths
+            tracked_hits: set[Path] = set()
+            code_hits: set[Path] = set()
+            extra_hits: set[Path] = set()
+            modules = ReactiveModule.instances
+            for p in files:
+                if p in modules:
+                    code_hits.add(p)
+                if (s := fs_signals.get(p)) is not None and s.subscribers:
+                    tracked_hits.add(p)
+                if p in extra_watch_set:
+                    extra_hits.add(p)
 
             asset_hits: set[Path] = set()
             if asset_spec is not None and refresh_cb is not None:
-                asset_hits = {p for p in files if not p.is_dir() and asset_spec.matches(p)}
+                # modules always restart, so there is no point asking the asset spec about them
+                asset_hits = {p for p in (files - code_hits if code_hits else files) if asset_spec.matches(p) and not p.is_dir()}
 
             if not (tracked_hits or code_hits or extra_hits or asset_hits):
                 return None
@@ -473,8 +613,9 @@ async def run_with_hmr_async(
                 if hmr.log_reload_events:
                     logger.warning("Assets changed (%d file(s)). Refreshing browser...", len(asset_hits))
 
-                info = ReloadInfo(files=frozenset(asset_hits), reasons=frozenset({RELOAD_REASON_ASSET_REFRESH}))
-                self._schedule_task(_call_hook(logger, "on_change_detected", hooks.on_change_detected, info))
+                info = ReloadInfo(files=frozenset(asset_hits), reasons=_REASON_SETS[0b1000])
+                if hooks.on_change_detected is not None:
+                    self._schedule_task(_fire_hook(logger, "on_change_detected", hooks.on_change_detected, info))
 
                 try:
                     res = refresh_cb()
@@ -484,25 +625,22 @@ async def run_with_hmr_async(
 
                 return None
 
-            if hmr.clear:
-                print("\033c", end="", flush=True)
-
-            reasons: set[str] = set()
-            if code_hits:
-                reasons.add(RELOAD_REASON_CODE)
-            if restart_tracked_hits:
-                reasons.add(RELOAD_REASON_TRACKED_FILE)
-            if restart_extra_hits:
-                reasons.add(RELOAD_REASON_EXTRA_WATCH_FILE)
-            if asset_hits:
-                reasons.add(RELOAD_REASON_ASSET_REFRESH)
-
-            relevant_files = set(code_hits) | set(restart_tracked_hits) | set(restart_extra_hits) | set(asset_hits)
-            info = ReloadInfo(files=frozenset(relevant_files), reasons=frozenset(reasons))
+            # a burst (git checkout, formatters) often re-reports files whose reload is still queued; say so only once
+            relevant_files = code_hits | restart_tracked_hits | restart_extra_hits | asset_hits
+            already_pending = self._pending_files.issuperset(relevant_files)
+
+            if self._clear_screen and not already_pending:
+                sys.stdout.write("\033c")
+                sys.stdout.flush()
+
+            reasons = bool(code_hits) | bool(restart_tracked_hits) << 1 | bool(restart_extra_hits) << 2 | bool(asset_hits) << 3
+
+            info = ReloadInfo(files=frozenset(relevant_files), reasons=_REASON_SETS[reasons])
             self._merge_reload_info(info)
-            self._schedule_task(_call_hook(logger, "on_change_detected", hooks.on_change_detected, info))
+            if hooks.on_change_detected is not None:
+                self._schedule_task(_fire_hook(logger, "on_change_detected", hooks.on_change_detected, info))
 
-            if hmr.log_reload_events:
+            if hmr.log_reload_events and not already_pending:
                 logger.warning("Watchfiles detected changes in %s. Reloading...", ", ".join(map(_display_path, relevant_files)))
 
             nonlocal need_restart
@@ -528,10 +666,12 @@ async def run_with_hmr_async(
                                 await sleep(next_allowed - now)
 
                         srv = make_server(reloader.app)
-                        if inspect.isawaitable(srv):
+                        if isawaitable(srv):
                             srv = await srv
+                        finish = Event()  # one per server generation: set for good once it stops, so a late waiter can't miss it
                         server = srv
-                        await _call_hook(logger, "on_server_created", hooks.on_server_created, srv)
+                        if hooks.on_server_created is not None:
+                            await _call_hook(logger, "on_server_created", hooks.on_server_created, srv)
                         try:
                             if manage_ready_event:
                                 server_ready_event.set()
@@ -543,8 +683,8 @@ async def run_with_hmr_async(
                             cancelled = e
                         finally:
                             finish.set()
-                            finish.clear()
-                            await _call_hook(logger, "on_server_stopped", hooks.on_server_stopped, srv)
+                            if hooks.on_server_stopped is not None:
+                                await _call_hook(logger, "on_server_stopped", hooks.on_server_stopped, srv)
                             server = None
                             server_ready_event.clear()
                     except CancelledError as e:
@@ -567,7 +707,12 @@ def run_with_hmr(
     refresh_callback: Callable[[], Any] | None = None,
     force_restart_files: set[Path] | None = None,
 ) -> None:
-    from asyncio import run
+    from importlib import import_module
+
+    try:
+        run = import_module("uvloop").run  # same loop uvicorn would pick for itself; optional, and unavailable on Windows
+    except (ImportError, AttributeError):  # `uvloop.run` only exists since uvloop 0.18
+        from asyncio import run
 
     run(
         run_with_hmr_async(
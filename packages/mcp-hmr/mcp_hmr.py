@@ -1,11 +1,12 @@
-import hashlib
 import logging
 import os
+import re
 import sys
 from importlib import import_module
 from importlib.machinery import ModuleSpec
 from importlib.util import find_spec, module_from_spec
 from pathlib import Path
+from time import time_ns
 from typing import Any
 
 __version__ = "0.0.3.1"
@@ -13,89 +14,83 @@ __version__ = "0.0.3.1"
 __all__ = "mcp_server", "run_with_hmr"
 
 
-def _is_valid_env_key(key: str) -> bool:
-    if not key:
-        return False
-    first = key[0]
-    if not (first == "_" or ("A" <= first <= "Z") or ("a" <= first <= "z")):
-        return False
-    return all(ch == "_" or ("A" <= ch <= "Z") or ("a" <= ch <= "z") or ("0" <= ch <= "9") for ch in key[1:])
+# `KEY=value`, optionally prefixed with `export `; the value group comes out stripped (or None when empty)
+_ASSIGNMENT_RE = re.compile(r"\s*+(?:export )?+\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*\S)?\s*", re.DOTALL)
+# only treat '#' as a comment delimiter when it is preceded by whitespace
+_COMMENT_RE = re.compile(r"\s#")
+# a quoted value runs up to the first unescaped closing quote (or the end of the line)
+_QUOTED_RES = {q: re.compile(rf"{q}((?:[^{q}\\]|\\.?)*)", re.DOTALL) for q in "\"'"}
+_ESCAPE_RE = re.compile(r"\\(.?)", re.DOTALL)
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
 
 
-def _strip_unquoted_comment(raw_value: str) -> str:
-    # Only treat '#' as a comment delimiter when it is preceded by whitespace.
-    for i in range(len(raw_value) - 1):
-        if raw_value[i].isspace() and raw_value[i + 1] == "#":
-            return raw_value[:i].rstrip()
-    return raw_value.strip()
+def _unescape(m: re.Match[str]) -> str:
+    esc = m[1]
+    return _ESCAPES.get(esc, esc) if esc else "\\"
 
 
 def _parse_quoted_value(raw_value: str) -> str:
-    quote = raw_value[0]
-    out: list[str] = []
-    i = 1
-    while i < len(raw_value):
-        ch = raw_value[i]
-        if ch == quote:
-            return "".join(out)
-        if ch == "\\" and i + 1 < len(raw_value):
-            i += 1
-            esc = raw_value[i]
-            out.append(
-                {
-                    "n": "\n",
-                    "r": "\r",
-                    "t": "\t",
-                    "\\": "\\",
-                    '"': '"',
-                    "'": "'",
-                }.get(esc, esc)
-            )
-            i += 1
-            continue
-        out.append(ch)
-        i += 1
-    return "".join(out)
-
-
-def _parse_dotenv_value(raw_value: str) -> str:
-    raw_value = raw_value.strip()
+    if "\\" not in raw_value:  # the common case: no escapes, so the value simply ends at the next quote
+        end = raw_value.find(raw_value[0], 1)
+        return raw_value[1:end] if end != -1 else raw_value[1:]
+    body = _QUOTED_RES[raw_value[0]].match(raw_value)[1]  # type: ignore[index]  # always matches: the value starts with the quote
+    return _ESCAPE_RE.sub(_unescape, body)
+
+
+def _parse_dotenv_value(raw_value: str | None) -> str:
     if not raw_value:
         return ""
     if raw_value[0] in {'"', "'"}:
         return _parse_quoted_value(raw_value)
-    return _strip_unquoted_comment(raw_value)
+    if m := _COMMENT_RE.search(raw_value):
+        return raw_value[: m.start()].rstrip()
+    return raw_value
 
 
 def _parse_dotenv(content: str) -> dict[str, str]:
     env: dict[str, str] = {}
     for raw_line in content.splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("export "):
-            line = line[7:].lstrip()
-        if "=" not in line:
-            continue
-        key, raw_value = line.split("=", 1)
-        key = key.strip()
-        if not _is_valid_env_key(key):
-            continue
-        env[key] = _parse_dotenv_value(raw_value)
+        # blank lines, comments and malformed lines simply don't match
+        if m := _ASSIGNMENT_RE.fullmatch(raw_line):
+            env[m[1]] = _parse_dotenv_value(m[2])
     return env
 
 
+# the resolved directories among `paths`, case-folded on Windows and `os.sep`-terminated, for a `str.startswith` containment test
+def _dir_prefixes(paths: list[str]) -> tuple[str, ...]:
+    return tuple(os.path.normcase(f"{str(d).rstrip(os.sep)}{os.sep}") for d in (Path(p).resolve() for p in paths) if d.is_dir())
+
+
+# a file written within this window of its last read may be rewritten again without its mtime moving (FAT keeps 2s, some mounts 1s)
+_MTIME_SLACK_NS = 2_000_000_000
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int, int] | None:
+    if time_ns() - st.st_mtime_ns < _MTIME_SLACK_NS:  # too recent to vouch for the content: let the byte comparison decide
+        return None
+    return st.st_ino, st.st_ctime_ns, st.st_mtime_ns, st.st_size
+
+
 class _EnvironmentManager:
     def __init__(self, env_file: Path, logger: logging.Logger):
         self._env_file = env_file
         self._logger = logger
         self._baseline: dict[str, str | None] = {}
         self._current: dict[str, str] = {}
-        self._last_digest: str | None = None
+        self._last_content: bytes | None = None
+        self._last_stat: tuple[int, int, int, int] | None = None  # `_stat_key` of the last version read
 
     def load_and_apply(self, *, reason: str) -> bool:
         try:
-            content = self._env_file.read_text("utf-8")
+            st = self._env_file.stat()
+            key = _stat_key(st)
+            if key is not None and key == self._last_stat:  # nothing was written since the last read
+                return False
+            data = self._env_file.read_bytes()
+            if data == self._last_content:  # rewritten with the same bytes (atomic saves, touch): skip decoding and parsing
+                self._last_stat = key
+                return False
+            content = data.decode("utf-8")
         except FileNotFoundError:
             self._logger.warning("Environment file not found: %s", self._env_file)
             return False
@@ -103,18 +98,17 @@ class _EnvironmentManager:
             self._logger.warning("Failed to read environment file %s (%s)", self._env_file, e)
             return False
 
-        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self._last_stat = key
         mapping = _parse_dotenv(content)
 
         if mapping == self._current:
-            self._last_digest = digest
+            self._last_content = data
             return False
 
-        prev_keys = set(self._current)
-        new_keys = set(mapping)
-        removed = prev_keys - new_keys
-        added = new_keys - prev_keys
-        changed = {k for k in prev_keys & new_keys if self._current[k] != mapping[k]}
+        current = self._current
+        removed = current.keys() - mapping.keys()
+        added = len(mapping.keys() - current.keys())
+        changed = sum(1 for k, v in mapping.items() if k in current and current[k] != v)  # only logged, so just count
 
         for key in removed:
             original = self._baseline.get(key)
@@ -123,21 +117,21 @@ class _EnvironmentManager:
             else:
                 os.environ[key] = original
 
-        for key, value in mapping.items():
-            if key not in self._baseline:
-                self._baseline[key] = os.environ.get(key)
-            os.environ[key] = value
+        environ, baseline = os.environ, self._baseline
+        for key in mapping.keys() - baseline.keys():  # remember what these keys were before we first touched them
+            baseline[key] = environ.get(key)
+        environ.update(mapping)
 
         self._current = mapping
-        self._last_digest = digest
+        self._last_content = data
 
         self._logger.info(
             "Loaded environment file (%s): %s (vars=%d, changed=%d, added=%d, removed=%d)",
             reason,
             self._env_file,
             len(mapping),
-            len(changed),
-            len(added),
+            changed,
+            added,
             len(removed),
         )
         return True
@@ -156,6 +150,7 @@ def mcp_server(target: str, *, environment: str | None = None, watch_debounce_ms
     from reactivity import async_effect, derived
     from reactivity.hmr.core import HMR_CONTEXT, AsyncReloader, _loader, get_path_module_map
     from reactivity.hmr.hooks import call_post_reload_hooks, call_pre_reload_hooks
+    from watchfiles import awatch
 
     logger = get_logger(__name__)
 
@@ -240,13 +235,9 @@ def mcp_server(target: str, *, environment: str | None = None, watch_debounce_ms
             self.error_filter.exclude_filenames.add(__file__)
 
         async def start_watching(self):
-            from watchfiles import awatch
-
             watch_paths: list[str] = [self.entry, *self.includes]
-            if env_file is not None:
-                roots = [Path(p).resolve() for p in watch_paths]
-                if not any(env_file.is_relative_to(r) for r in roots if r.is_dir()):
-                    watch_paths.append(str(env_file))
+            if env_file is not None and not os.path.normcase(f"{env_file}{os.sep}").startswith(_dir_prefixes(watch_paths)):
+                watch_paths.append(str(env_file))
 
             awatch_kwargs: dict[str, Any] = {"stop_event": self._stop_event}
             if watch_debounce_ms is not None:
@@ -273,19 +264,18 @@ def mcp_server(target: str, *, environment: str | None = None, watch_debounce_ms
                     else:
                         files.add(server_origin)
 
-            path2module = get_path_module_map()
-            invalidating_code = sorted(code_event_files & set(path2module), key=lambda p: str(p))
-            if env_applied:
-                logger.info("Reload triggered by environment file change: %s", env_file)
-            if invalidating_code:
-                shown = invalidating_code[:5]
-                suffix = "" if len(invalidating_code) <= 5 else f", +{len(invalidating_code) - 5} more"
-                logger.info(
-                    "Reload triggered by code changes (%d file(s)): %s%s",
-                    len(invalidating_code),
-                    ", ".join(map(str, shown)),
-                    suffix,
-                )
+            if logger.isEnabledFor(logging.INFO):  # everything below only feeds info logs
+                if env_applied:
+                    logger.info("Reload triggered by environment file change: %s", env_file)
+                if invalidating_code := code_event_files & get_path_module_map().keys():
+                    shown = sorted(invalidating_code, key=str)[:5]
+                    suffix = "" if len(invalidating_code) <= 5 else f", +{len(invalidating_code) - 5} more"
+                    logger.info(
+                        "Reload triggered by code changes (%d file(s)): %s%s",
+                        len(invalidating_code),
+                        ", ".join(map(str, shown)),
+                        suffix,
+                    )
 
             return super().on_changes(files)
 
@@ -1,11 +1,10 @@
 import sys
-from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 from time import time
 from typing import Annotated
 
-from hmr_runner import HMRConfig, HMRHooks, ReloadInfo, run_with_hmr, run_with_hmr_async
+from hmr_runner import HMRConfig, HMRHooks, ReloadInfo, find_module_source, run_with_hmr, run_with_hmr_async
 from typer import Argument, Option, Typer, secho
 
 UvicornHMRConfig = HMRConfig
@@ -36,27 +35,34 @@ def _resolve_slug(slug: str) -> ResolvedSlug:
         raise ValueError(f"Invalid slug (expected 'module:attr'): {slug!r}")
 
     module, attr = slug.split(":", 1)
-    fragment = module.replace(".", "/")
 
-    for path in ("", *sys.path):
-        if (file := Path(path, f"{fragment}.py")).is_file():
-            break
-        if (file := Path(path, fragment, "__init__.py")).is_file():
-            break
-    else:
-        raise ModuleNotFoundError(f"Module {module!r} not found on sys.path")
+    return ResolvedSlug(slug=slug, module=module, attr=attr, file=find_module_source(module))
 
-    return ResolvedSlug(slug=slug, module=module, attr=attr, file=file.resolve())
 
-
-def _lazy_import_from_uvicorn(*, refresh: bool, main_loop_started, until, hmr_context, state_fn):
-    from asyncio import FIRST_COMPLETED, ensure_future, sleep, wait
+def _lazy_import_from_uvicorn(*, refresh: bool, main_loop_started):
+    from asyncio import Event, ensure_future, sleep
+    from logging import getLogger
     from signal import SIGINT
 
     from uvicorn import Config, Server
 
+    logger = getLogger("uvicorn.error")  # the logger uvicorn's own `Server` reports through
+
     class _Server(Server):
-        should_exit = state_fn(False, context=hmr_context)  # noqa: FBT003
+        def __init__(self, config: Config):
+            self._exit_event = Event()  # set exactly when `should_exit` becomes true, so `main_loop` can wait on it directly
+            super().__init__(config)
+
+        @property
+        def should_exit(self) -> bool:
+            return self._exit_event.is_set()
+
+        @should_exit.setter
+        def should_exit(self, value: bool) -> None:
+            if value:
+                self._exit_event.set()
+            else:
+                self._exit_event.clear()
 
         def handle_exit(self, sig, frame):
             if self.force_exit and sig == SIGINT:
@@ -75,7 +81,15 @@ def _lazy_import_from_uvicorn(*, refresh: bool, main_loop_started, until, hmr_co
                     self.should_exit |= await self.on_tick(counter)
                     counter += 10
 
-            await wait((until(lambda: self.should_exit), ensure_future(ticking())), return_when=FIRST_COMPLETED)
+            ticker = ensure_future(ticking())
+            ticker.add_done_callback(lambda _: self._exit_event.set())  # a failing `on_tick` must not leave us waiting forever
+            try:
+                await self._exit_event.wait()
+            finally:
+                ticker.cancel()
+            if ticker.done() and not ticker.cancelled() and (exc := ticker.exception()) is not None:
+                # log instead of raising, so `Server._serve` still runs `shutdown` (sockets, connections, lifespan)
+                logger.error("Server tick failed, shutting down", exc_info=exc)
 
         if refresh:
 
@@ -90,14 +104,8 @@ def _lazy_import_from_uvicorn(*, refresh: bool, main_loop_started, until, hmr_co
     return _Server, Config
 
 
-def _make_default_server_factory(*, host: str, port: int, env_file: Path | None, log_level: str | None, refresh: bool, main_loop_started, until, hmr_context, state_fn):
-    server_cls, config_cls = _lazy_import_from_uvicorn(
-        refresh=refresh,
-        main_loop_started=main_loop_started,
-        until=until,
-        hmr_context=hmr_context,
-        state_fn=state_fn,
-    )
+def _make_default_server_factory(*, host: str, port: int, env_file: Path | None, log_level: str | None, refresh: bool, main_loop_started):
+    server_cls, config_cls = _lazy_import_from_uvicorn(refresh=refresh, main_loop_started=main_loop_started)
 
     def make_server(app):
         return server_cls(config_cls(app, host, port, env_file=env_file, log_level=log_level))
@@ -128,12 +136,9 @@ def run_slug_with_hmr(
     if resolved.module in sys.modules:
         raise RuntimeError(f"It seems you've already imported `{resolved.module}` as a normal module. You should call `reactivity.hmr.core.patch_meta_path()` before it.")
 
-    from asyncio import Event, Future
+    from asyncio import Event
     from importlib import import_module
 
-    from reactivity import state
-    from reactivity.hmr.core import HMR_CONTEXT
-
     cwd = str(Path.cwd())
     if cwd not in sys.path:
         sys.path.insert(0, cwd)
@@ -146,17 +151,6 @@ def run_slug_with_hmr(
 
     server_ready = Event()
 
-    def until(func: Callable[[], bool]):
-        future = Future()
-        future.add_done_callback(lambda _: check.dispose())
-
-        @HMR_CONTEXT.effect
-        def check():
-            if func():
-                future.set_result(None)
-
-        return future
-
     make_server = _make_default_server_factory(
         host=host,
         port=port,
@@ -164,20 +158,17 @@ def run_slug_with_hmr(
         log_level=log_level,
         refresh=refresh,
         main_loop_started=server_ready,
-        until=until,
-        hmr_context=HMR_CONTEXT,
-        state_fn=state,
     )
 
     extra_watch_files: list[Path] = []
     force_restart_files: set[Path] | None = None
-    if env_file is not None and env_file.expanduser().is_file():
-        env_path = env_file.expanduser().resolve()
+    if env_file is not None and (env_path := env_file.expanduser()).is_file():
+        env_path = env_path.resolve()
         extra_watch_files.append(env_path)
         force_restart_files = {env_path}
 
     hmr = UvicornHMRConfig(
-        reload_include=reload_include or [str(Path.cwd())],
+        reload_include=reload_include or [cwd],
         reload_exclude=reload_exclude or [".venv"],
         clear=clear,
         refresh=refresh,
@@ -209,7 +200,7 @@ app = Typer(help="Hot Module Replacement for Uvicorn", add_completion=False, pre
 @app.command(no_args_is_help=True)
 def main(
     slug: Annotated[str, Argument()] = "main:app",
-    reload_include: list[str] = [str(Path.cwd())],  # noqa: B006, B008
+    reload_include: Annotated[list[str] | None, Option(show_default="current directory")] = None,
     reload_exclude: list[str] = [".venv"],  # noqa: B006
     asset_include: Annotated[list[str], Option("--asset-include", help="Asset refresh include (paths or globs). Requires --refresh.")] = [],  # noqa: B006
     asset_exclude: Annotated[list[str], Option("--asset-exclude", help="Asset refresh exclude (paths or globs). Requires --refresh.")] = [],  # noqa: B006
@@ -258,14 +249,6 @@ def main(
         return secho(str(e), fg="red")
 
 
-def _display_path(path: str | Path):
-    p = Path(path).resolve()
-    try:
-        return f"'{p.relative_to(Path.cwd())}'"
-    except ValueError:
-        return f"'{p}'"
-
-
 NOTE = """
 When you enable the `--refresh` flag, it means you want to use the `fastapi-reloader` package to enable automatic HTML page refreshing.
 This behavior differs from Uvicorn's built-in `--reload` functionality.
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Annotated, Any
 
 from hmr_reloader import send_reload_signal, wsgi_auto_refresh_middleware
-from hmr_runner import HMRConfig, HMRHooks, ReloadInfo, run_with_hmr, run_with_hmr_async
+from hmr_runner import HMRConfig, HMRHooks, ReloadInfo, find_module_source, run_with_hmr, run_with_hmr_async
 from typer import Argument, Option, Typer, secho
 
 WSGIHMRConfig = HMRConfig
@@ -36,17 +36,8 @@ def _resolve_slug(slug: str) -> ResolvedSlug:
         raise ValueError(f"Invalid slug (expected 'module:attr'): {slug!r}")
 
     module, attr = slug.split(":", 1)
-    fragment = module.replace(".", "/")
 
-    for path in ("", *sys.path):
-        if (file := Path(path, f"{fragment}.py")).is_file():
-            break
-        if (file := Path(path, fragment, "__init__.py")).is_file():
-            break
-    else:
-        raise ModuleNotFoundError(f"Module {module!r} not found on sys.path")
-
-    return ResolvedSlug(slug=slug, module=module, attr=attr, file=file.resolve())
+    return ResolvedSlug(slug=slug, module=module, attr=attr, file=find_module_source(module))
 
 
 def _make_server_factory(*, host: str, port: int, refresh: bool) -> Callable[[Any], Any]:
@@ -120,7 +111,7 @@ def run_slug_with_hmr(
     make_server = _make_server_factory(host=host, port=port, refresh=refresh)
 
     hmr = WSGIHMRConfig(
-        reload_include=reload_include or [str(Path.cwd())],
+        reload_include=reload_include or [cwd],
         reload_exclude=reload_exclude or [".venv"],
         clear=clear,
         refresh=refresh,
@@ -149,7 +140,7 @@ app = Typer(help="Hot Module Replacement for WSGI development servers (Werkzeug)
 @app.command(no_args_is_help=True)
 def main(
     slug: Annotated[str, Argument()] = "main:app",
-    reload_include: list[str] = [str(Path.cwd())],  # noqa: B006, B008
+    reload_include: Annotated[list[str] | None, Option(show_default="current directory")] = None,
     reload_exclude: list[str] = [".venv"],  # noqa: B006
     asset_include: Annotated[list[str], Option("--asset-include", help="Asset refresh include (paths or globs). Requires --refresh.")] = [],  # noqa: B006
     asset_exclude: Annotated[list[str], Option("--asset-exclude", help="Asset refresh exclude (paths or globs). Requires --refresh.")] = [],  # noqa: B006